@@ -1,17 +1,33 @@
 import os
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import copy
+import asyncio
+import json
 import re
 import urllib.parse
 import secrets
-from typing import List, Optional, Dict, Any
+import hashlib
+import hmac
+import threading
+import time
+from typing import List, Optional, Dict, Any, Tuple
 from difflib import SequenceMatcher
+from functools import lru_cache, wraps
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 
 # third-party
 import mysql.connector
+from mysql.connector import pooling
 from fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse, JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse, JSONResponse, Response
 from starlette.middleware import Middleware
 
 # optional Levenshtein import
@@ -20,13 +36,34 @@ try:
 except Exception:
     Levenshtein = None
 
+# optional RapidFuzz import (batched C scoring for the fuzzy fallback)
+try:
+    from rapidfuzz import process as rf_process, fuzz as rf_fuzz
+except Exception:
+    rf_process = None
+    rf_fuzz = None
+
 # -------------------------------
 # Configuration
 # -------------------------------
 REQUIRE_API_KEY = os.environ.get("REQUIRE_API_KEY", "true").lower() == "true"
-VALID_API_KEYS = set(os.environ.get("API_KEYS", "").split(",")) if REQUIRE_API_KEY else set()
+VALID_API_KEYS = frozenset(k.strip() for k in os.environ.get("API_KEYS", "").split(",") if k.strip()) if REQUIRE_API_KEY else frozenset()
 DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
 SCANNER_MODE = os.environ.get("SCANNER_MODE", "false").lower() == "true"
+# How long employee lookups, leave balances and reference data are reused; 0 disables caching
+# (the active-employee list behind the fuzzy fallback is capped at 60s within this)
+CACHE_TTL_SECONDS = int(os.environ.get("CACHE_TTL_SECONDS", "300"))
+
+# Debug logging: request-path call sites only enqueue records; a listener
+# thread does the actual stdout writes
+logger = logging.getLogger("leave_manager")
+logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+logger.propagate = False
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 # Debug output
 print("=" * 50)
@@ -35,6 +72,7 @@ print("=" * 50)
 print(f"🔧 REQUIRE_API_KEY: {REQUIRE_API_KEY}")
 print(f"🔧 SCANNER_MODE: {SCANNER_MODE}")
 print(f"🔧 DEBUG: {DEBUG}")
+print(f"🔧 CACHE_TTL_SECONDS: {CACHE_TTL_SECONDS}")
 print(f"🔧 Valid API Keys: {len(VALID_API_KEYS)}")
 if VALID_API_KEYS:
     for i, key in enumerate(VALID_API_KEYS):
@@ -44,81 +82,110 @@ print("=" * 50)
 # -------------------------------
 # API Key Authentication Middleware - FIXED VERSION
 # -------------------------------
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if DEBUG:
-            print(f"🔧 Processing: {request.method} {request.url.path}")
+# Keys are compared as SHA-256 digests in constant time, so response timing
+# doesn't reveal how much of a guessed key was right
+_VALID_KEY_HASHES = tuple(hashlib.sha256(k.encode("utf-8")).digest() for k in VALID_API_KEYS)
+
+def _is_valid_api_key(api_key: str) -> bool:
+    candidate = hashlib.sha256(api_key.encode("utf-8")).digest()
+    valid = False
+    for key_hash in _VALID_KEY_HASHES:
+        # no early exit: every configured key is checked on every request
+        valid |= hmac.compare_digest(candidate, key_hash)
+    return valid
+
+# Rejection bodies never change, so serialize them once instead of per request
+_MISSING_KEY_BODY = json.dumps({
+    "error": "API key required",
+    "message": "Provide API key via Authorization: Bearer <key>, X-API-Key header, or api_key query parameter"
+}, separators=(",", ":")).encode("utf-8")
+_INVALID_KEY_BODY = json.dumps({
+    "error": "Invalid API key",
+    "message": "The provided API key is not valid"
+}, separators=(",", ":")).encode("utf-8")
+
+class APIKeyMiddleware:
+    """
+    Plain ASGI middleware: avoids BaseHTTPMiddleware's extra task and
+    response-body stream on every request
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        logger.debug("🔧 Processing: %s %s", scope['method'], path)
         
         # Skip auth for health check, root endpoint, tools discovery, and MCP config
         public_paths = ["/health", "/", "/.well-known/mcp/tools", "/.well-known/mcp-config"]
-        if request.url.path in public_paths:
-            if DEBUG:
-                print("✅ Skipping auth for public endpoint")
-            return await call_next(request)
+        if path in public_paths:
+            logger.debug("✅ Skipping auth for public endpoint")
+            await self.app(scope, receive, send)
+            return
         
         # Skip auth during scanner mode for ALL MCP requests
-        if SCANNER_MODE and request.url.path == "/mcp":
-            if DEBUG:
-                print("🔍 Scanner mode enabled - allowing MCP access without auth")
-            return await call_next(request)
+        if SCANNER_MODE and path == "/mcp":
+            logger.debug("🔍 Scanner mode enabled - allowing MCP access without auth")
+            await self.app(scope, receive, send)
+            return
         
         # Skip auth if not required
         if not REQUIRE_API_KEY:
-            if DEBUG:
-                print("🔓 Auth not required - allowing access")
-            return await call_next(request)
+            logger.debug("🔓 Auth not required - allowing access")
+            await self.app(scope, receive, send)
+            return
         
-        if DEBUG:
-            print("🔐 Checking API key authentication...")
+        logger.debug("🔐 Checking API key authentication...")
         
-        # Extract API key from headers or query parameters
+        # Extract API key from headers or query parameters, reading the raw
+        # ASGI header list in a single pass (names arrive lower-cased)
         api_key = None
+        auth_header = None
+        x_api_key = None
+        for header_name, header_value in scope["headers"]:
+            if header_name == b"authorization" and auth_header is None:
+                auth_header = header_value
+            elif header_name == b"x-api-key" and x_api_key is None:
+                x_api_key = header_value
         
         # Check Authorization header
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            api_key = auth_header.replace("Bearer ", "")
-            if DEBUG:
-                print(f"📨 Found API key in Authorization header: {api_key[:10]}...")
+        if auth_header and auth_header.startswith(b"Bearer "):
+            api_key = auth_header[7:].decode("latin-1")
+            logger.debug("📨 Found API key in Authorization header: %s...", api_key[:10])
         
         # Check X-API-Key header
-        if not api_key:
-            api_key = request.headers.get("X-API-Key")
-            if api_key and DEBUG:
-                print(f"📨 Found API key in X-API-Key header: {api_key[:10]}...")
+        if not api_key and x_api_key:
+            api_key = x_api_key.decode("latin-1")
+            logger.debug("📨 Found API key in X-API-Key header: %s...", api_key[:10])
         
-        # Check query parameter
-        if not api_key:
-            api_key = request.query_params.get("api_key")
-            if api_key and DEBUG:
-                print(f"📨 Found API key in query parameter: {api_key[:10]}...")
+        # Check query parameter (only parsed when no header carried a key)
+        if not api_key and scope.get("query_string"):
+            for param, value in urllib.parse.parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True):
+                if param == "api_key":
+                    api_key = value
+                    break
+            if api_key:
+                logger.debug("📨 Found API key in query parameter: %s...", api_key[:10])
         
         # Validate API key
         if not api_key:
-            if DEBUG:
-                print("❌ No API key provided")
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "error": "API key required",
-                    "message": "Provide API key via Authorization: Bearer <key>, X-API-Key header, or api_key query parameter"
-                }
-            )
+            logger.debug("❌ No API key provided")
+            response = Response(content=_MISSING_KEY_BODY, status_code=401, media_type="application/json")
+            await response(scope, receive, send)
+            return
         
-        if api_key not in VALID_API_KEYS:
-            if DEBUG:
-                print(f"❌ Invalid API key provided: {api_key[:10]}...")
-            return JSONResponse(
-                status_code=403,
-                content={
-                    "error": "Invalid API key",
-                    "message": "The provided API key is not valid"
-                }
-            )
+        if not _is_valid_api_key(api_key):
+            logger.debug("❌ Invalid API key provided: %s...", api_key[:10])
+            response = Response(content=_INVALID_KEY_BODY, status_code=403, media_type="application/json")
+            await response(scope, receive, send)
+            return
         
-        if DEBUG:
-            print("✅ API key validated successfully")
-        return await call_next(request)
+        logger.debug("✅ API key validated successfully")
+        await self.app(scope, receive, send)
 
 # -------------------------------
 # MCP server with middleware
@@ -128,328 +195,486 @@ mcp = FastMCP(
     middleware=[Middleware(APIKeyMiddleware)]
 )
 
+def run_in_thread(fn):
+    """
+    Expose a blocking (DB-bound) tool as a coroutine that runs in a worker thread,
+    so a slow MySQL round trip doesn't stall the event loop for other requests.
+    wraps() keeps the name, docstring and signature FastMCP reads for the tool schema.
+    """
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return wrapper
+
 # -------------------------------
 # MCP Configuration Schema Endpoint
 # -------------------------------
+# Discovery documents never change while the server runs: serialize them once
+# and let clients cache them
+_STATIC_JSON_HEADERS = {"Cache-Control": "public, max-age=300"}
+
+def _static_json(content: Any) -> bytes:
+    """Encode a discovery document the same way JSONResponse would"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+_MCP_CONFIG_BODY = _static_json({
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "$id": "/.well-known/mcp-config",
+    "title": "MCP Session Configuration",
+    "description": "Schema for the MCP endpoint configuration",
+    "type": "object",
+    "properties": {
+        "api_key": {
+            "type": "string",
+            "description": "API key for authentication"
+        }
+    },
+    "x-query-style": "dot+bracket"
+})
+
 @mcp.custom_route("/.well-known/mcp-config", methods=["GET"])
-async def mcp_config_schema(request: Request) -> JSONResponse:
+async def mcp_config_schema(request: Request) -> Response:
     """MCP configuration schema endpoint for Smithery discovery"""
-    return JSONResponse({
-        "$schema": "https://json-schema.org/draft/2020-12/schema",
-        "$id": "/.well-known/mcp-config",
-        "title": "MCP Session Configuration",
-        "description": "Schema for the MCP endpoint configuration",
-        "type": "object",
-        "properties": {
-            "api_key": {
-                "type": "string",
-                "description": "API key for authentication"
-            }
-        },
-        "x-query-style": "dot+bracket"
-    })
+    return Response(_MCP_CONFIG_BODY, media_type="application/json", headers=_STATIC_JSON_HEADERS)
 
 # -------------------------------
 # Public Tools Discovery Endpoint for Smithery Scanner
 # -------------------------------
-@mcp.custom_route("/.well-known/mcp/tools", methods=["GET"])
-async def public_tools_list(request: Request) -> JSONResponse:
-    """Public endpoint for Smithery to discover available tools without authentication"""
-    
-    tools_info = [
-        {
-            "name": "get_employee_details",
-            "description": "Get comprehensive details for an employee including personal info, leave balance, and recent activity",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name to search for"},
-                    "additional_context": {"type": "string", "description": "Additional context like designation, email, etc."}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_leave_balance",
-            "description": "Get detailed leave balance information for an employee",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "additional_context": {"type": "string", "description": "Additional context for disambiguation"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "search_employees",
-            "description": "Search for employees by name, designation, email, or employee number",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "search_query": {"type": "string", "description": "Search term for employees"}
-                },
-                "required": ["search_query"]
-            }
-        },
-        {
-            "name": "get_work_report",
-            "description": "Get work report for an employee for specified number of days",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "days": {"type": "integer", "description": "Number of days to look back", "default": 7},
-                    "additional_context": {"type": "string", "description": "Additional context"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_leave_history",
-            "description": "Get leave history for an employee",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "additional_context": {"type": "string", "description": "Additional context"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_employee_profile",
-            "description": "Return extended HR profile (documents, PF status, confirmation, etc.)",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "additional_context": {"type": "string", "description": "Additional context"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_appraisal_feedback",
-            "description": "Get recent positive/negative feedback for an employee",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "additional_context": {"type": "string", "description": "Additional context"},
-                    "limit": {"type": "integer", "description": "Number of feedback entries", "default": 5}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_incentives",
-            "description": "Retrieve incentive earnings for an employee",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "additional_context": {"type": "string", "description": "Additional context"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_attendance_summary",
-            "description": "Summarize attendance/presence using work_report entries and approved leaves",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "days": {"type": "integer", "description": "Number of days to analyze", "default": 30},
-                    "additional_context": {"type": "string", "description": "Additional context"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_pf_status",
-            "description": "Check PF status and PF join / releiving dates",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Employee name"},
-                    "additional_context": {"type": "string", "description": "Additional context"}
-                },
-                "required": ["name"]
-            }
-        },
-        {
-            "name": "get_client_list",
-            "description": "List clients with contact details",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "active_only": {"type": "boolean", "description": "Show only active clients", "default": true}
-                }
-            }
-        },
-        {
-            "name": "get_projects_overview",
-            "description": "Show active (or all) projects with client info",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "active_only": {"type": "boolean", "description": "Show only active projects", "default": true}
-                }
-            }
-        },
-        {
-            "name": "get_project_status_updates",
-            "description": "Fetch milestone progress & completion percentage",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "project_settings_id": {"type": "integer", "description": "Specific project ID"},
-                    "limit": {"type": "integer", "description": "Number of updates", "default": 20}
-                }
+_TOOLS_INFO = [
+    {
+        "name": "get_employee_details",
+        "description": "Get comprehensive details for an employee including personal info, leave balance, and recent activity",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name to search for"},
+                "additional_context": {"type": "string", "description": "Additional context like designation, email, etc."}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_leave_balance",
+        "description": "Get detailed leave balance information for an employee",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "additional_context": {"type": "string", "description": "Additional context for disambiguation"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "search_employees",
+        "description": "Search for employees by name, designation, email, or employee number",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "search_query": {"type": "string", "description": "Search term for employees"}
+            },
+            "required": ["search_query"]
+        }
+    },
+    {
+        "name": "get_work_report",
+        "description": "Get work report for an employee for specified number of days",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "days": {"type": "integer", "description": "Number of days to look back", "default": 7},
+                "additional_context": {"type": "string", "description": "Additional context"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_leave_history",
+        "description": "Get leave history for an employee",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "additional_context": {"type": "string", "description": "Additional context"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_employee_profile",
+        "description": "Return extended HR profile (documents, PF status, confirmation, etc.)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "additional_context": {"type": "string", "description": "Additional context"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_appraisal_feedback",
+        "description": "Get recent positive/negative feedback for an employee",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "additional_context": {"type": "string", "description": "Additional context"},
+                "limit": {"type": "integer", "description": "Number of feedback entries", "default": 5}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_incentives",
+        "description": "Retrieve incentive earnings for an employee",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "additional_context": {"type": "string", "description": "Additional context"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_attendance_summary",
+        "description": "Summarize attendance/presence using work_report entries and approved leaves",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "days": {"type": "integer", "description": "Number of days to analyze", "default": 30},
+                "additional_context": {"type": "string", "description": "Additional context"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_pf_status",
+        "description": "Check PF status and PF join / releiving dates",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Employee name"},
+                "additional_context": {"type": "string", "description": "Additional context"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "get_client_list",
+        "description": "List clients with contact details",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "active_only": {"type": "boolean", "description": "Show only active clients", "default": True}
             }
-        },
-        {
-            "name": "get_payments_summary",
-            "description": "View total payments received & missed invoices summary for last N months",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "period_months": {"type": "integer", "description": "Number of months to analyze", "default": 12}
-                }
+        }
+    },
+    {
+        "name": "get_projects_overview",
+        "description": "Show active (or all) projects with client info",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "active_only": {"type": "boolean", "description": "Show only active projects", "default": True}
             }
-        },
-        {
-            "name": "get_fixed_expenses",
-            "description": "Retrieve company/project-level fixed expenses",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "project_id": {"type": "string", "description": "Specific project ID"}
-                }
+        }
+    },
+    {
+        "name": "get_project_status_updates",
+        "description": "Fetch milestone progress & completion percentage",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "project_settings_id": {"type": "integer", "description": "Specific project ID"},
+                "limit": {"type": "integer", "description": "Number of updates", "default": 20}
             }
-        },
-        {
-            "name": "get_holidays",
-            "description": "List upcoming company holidays",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "upcoming_days": {"type": "integer", "description": "Number of days to look ahead", "default": 90}
-                }
+        }
+    },
+    {
+        "name": "get_payments_summary",
+        "description": "View total payments received & missed invoices summary for last N months",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "period_months": {"type": "integer", "description": "Number of months to analyze", "default": 12}
             }
-        },
-        {
-            "name": "generate_api_key",
-            "description": "Generate a new secure API key for authentication",
-            "inputSchema": {
-                "type": "object",
-                "properties": {}
+        }
+    },
+    {
+        "name": "get_fixed_expenses",
+        "description": "Retrieve company/project-level fixed expenses",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "project_id": {"type": "string", "description": "Specific project ID"}
             }
-        },
-        {
-            "name": "check_auth_status",
-            "description": "Check current authentication configuration",
-            "inputSchema": {
-                "type": "object",
-                "properties": {}
+        }
+    },
+    {
+        "name": "get_holidays",
+        "description": "List upcoming company holidays",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "upcoming_days": {"type": "integer", "description": "Number of days to look ahead", "default": 90}
             }
         }
-    ]
-    
-    return JSONResponse({
-        "tools": tools_info,
-        "count": len(tools_info),
-        "authentication_required": REQUIRE_API_KEY and not SCANNER_MODE,
-        "authentication_methods": [
-            "Authorization: Bearer <api_key>",
-            "X-API-Key: <api_key>", 
-            "api_key query parameter"
-        ],
-        "server_info": {
-            "name": "LeaveManagerPlus",
-            "version": "1.16.1",
-            "description": "Secure HR and company management system"
+    },
+    {
+        "name": "generate_api_key",
+        "description": "Generate a new secure API key for authentication",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
         }
-    })
+    },
+    {
+        "name": "check_auth_status",
+        "description": "Check current authentication configuration",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "clear_cache",
+        "description": "Clear cached employee lookups, leave balances and company reference data so the next call reads fresh data",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    }
+]
+
+_TOOLS_LIST_BODY = _static_json({
+    "tools": _TOOLS_INFO,
+    "count": len(_TOOLS_INFO),
+    "authentication_required": REQUIRE_API_KEY and not SCANNER_MODE,
+    "authentication_methods": [
+        "Authorization: Bearer <api_key>",
+        "X-API-Key: <api_key>", 
+        "api_key query parameter"
+    ],
+    "server_info": {
+        "name": "LeaveManagerPlus",
+        "version": "1.16.1",
+        "description": "Secure HR and company management system"
+    }
+})
+
+@mcp.custom_route("/.well-known/mcp/tools", methods=["GET"])
+async def public_tools_list(request: Request) -> Response:
+    """Public endpoint for Smithery to discover available tools without authentication"""
+    return Response(_TOOLS_LIST_BODY, media_type="application/json", headers=_STATIC_JSON_HEADERS)
 
 # -------------------------------
-# MySQL connection (reads from env)
+# MySQL connection pool (reads from env)
 # -------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+# DB credentials from environment variables, resolved once at import
+_DB_KWARGS: Dict[str, Any] = dict(
+    host=os.environ.get("DB_HOST", "103.174.10.72"),
+    user=os.environ.get("DB_USER", "tt_crm_mcp"),
+    password=os.environ.get("DB_PASSWORD", "F*PAtqhu@sg2w58n"),
+    database=os.environ.get("DB_NAME", "tt_crm_mcp"),
+    port=int(os.environ.get("DB_PORT", "3306")),
+    autocommit=True,
+    # C extension protocol/row parsing whenever it is installed (use_pure=False raises without it)
+    use_pure=not getattr(mysql.connector, "HAVE_CEXT", False),
+)
+# mysql-connector caps a pool at CNX_POOL_MAXSIZE (32) connections
+_DB_POOL_SIZE = max(1, min(int(os.environ.get("DB_POOL_SIZE", "16")), pooling.CNX_POOL_MAXSIZE))
+
+def _get_pool() -> pooling.MySQLConnectionPool:
+    """Create the connection pool on first use so importing the module never touches the DB"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(pool_name="ttpool", pool_size=_DB_POOL_SIZE, **_DB_KWARGS)
+    return _pool
+
 def get_connection():
     """
-    Read DB credentials from environment variables
+    Borrow a pooled connection; conn.close() returns it to the pool.
+    Falls back to a dedicated connection when every pooled one is in use.
     """
-    return mysql.connector.connect(
-        host=os.environ.get("DB_HOST", "103.174.10.72"),
-        user=os.environ.get("DB_USER", "tt_crm_mcp"),
-        password=os.environ.get("DB_PASSWORD", "F*PAtqhu@sg2w58n"),
-        database=os.environ.get("DB_NAME", "tt_crm_mcp"),
-        port=int(os.environ.get("DB_PORT", "3306")),
-        autocommit=True,
-    )
+    try:
+        return _get_pool().get_connection()
+    except pooling.PoolError:
+        logger.debug("Connection pool exhausted - opening a dedicated connection")
+        return mysql.connector.connect(**_DB_KWARGS)
+
+@contextmanager
+def db_cursor(conn=None, **cursor_kwargs):
+    """
+    Yield a (dictionary by default) cursor and always close it. Borrows a pooled
+    connection and returns it afterwards, unless the caller passes one in.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        cursor_kwargs.setdefault("dictionary", True)
+        cursor = conn.cursor(**cursor_kwargs)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    finally:
+        if own_conn:
+            conn.close()
+
+# -------------------------------
+# Short-lived result cache (HR data changes on human timescales)
+# -------------------------------
+_ttl_caches: List[Any] = []
+
+def ttl_cache(maxsize: int = 2048, should_cache=bool, key=None):
+    """
+    Memoize a function for CACHE_TTL_SECONDS, keyed on its arguments (or on
+    key(*args, **kwargs) when given). Hits return a shallow copy so callers can't
+    mutate the cached value; results failing should_cache (e.g. error dicts) are
+    never stored. Adds fn.cache_clear().
+    """
+    def decorator(fn):
+        entries: "OrderedDict[Any, Any]" = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if CACHE_TTL_SECONDS <= 0:
+                return fn(*args, **kwargs)
+            cache_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(cache_key)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(cache_key)
+                    return copy.copy(entry[1])
+            result = fn(*args, **kwargs)
+            if should_cache(result):
+                with lock:
+                    entries[cache_key] = (now + CACHE_TTL_SECONDS, result)
+                    entries.move_to_end(cache_key)
+                    while len(entries) > maxsize:
+                        entries.popitem(last=False)
+            return copy.copy(result)
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        _ttl_caches.append(wrapper)
+        return wrapper
+    return decorator
+
+def clear_result_caches() -> int:
+    """Drop every ttl_cache entry and the active-employee list; returns the number of caches cleared"""
+    for cached_fn in _ttl_caches:
+        cached_fn.cache_clear()
+    with _active_employees_lock:
+        _active_employees_cache["expires_at"] = 0.0
+        _active_employees_cache["rows"] = []
+        _active_employees_cache["norm_names"] = []
+    return len(_ttl_caches) + 1
 
 # -------------------------------
 # AI-Powered Name Matching Utilities
 # -------------------------------
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_FUZZY_PRUNE_MARGIN = 0.3
+
+# ASCII characters _PUNCT_RE removes (neither word characters nor whitespace),
+# as a str.translate deletion table
+_ASCII_PUNCT_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c == '_' or c.isspace())
+))
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    name = (name or "").lower()
+    # one C-level translate for ASCII names; the regex only for the rest
+    name = name.translate(_ASCII_PUNCT_TABLE) if name.isascii() else _PUNCT_RE.sub('', name)
+    return ' '.join(name.split())
+
+@lru_cache(maxsize=8192)
+def _similarity_norm(name1_norm: str, name2_norm: str, score_cutoff: float = 0.0) -> float:
+    """
+    Similarity of two already-normalized names (memoized: permutations often repeat a pair).
+    Scores below score_cutoff come back as 0.
+    """
+    # The ratio is 2*matches/(len1+len2) and matches <= the shorter length, so a
+    # large length gap rules the pair out without running the DP at all
+    total_len = len(name1_norm) + len(name2_norm)
+    if score_cutoff and total_len and 2 * min(len(name1_norm), len(name2_norm)) < score_cutoff * total_len:
+        return 0.0
+    # rapidfuzz, Levenshtein and SequenceMatcher ratios all measure the same normalized
+    # similarity; prefer the fastest one installed
+    if rf_fuzz:
+        return rf_fuzz.ratio(name1_norm, name2_norm, score_cutoff=score_cutoff * 100) / 100.0
+    if Levenshtein:
+        try:
+            return Levenshtein.ratio(name1_norm, name2_norm, score_cutoff=score_cutoff)
+        except Exception:
+            pass
+    score = SequenceMatcher(None, name1_norm, name2_norm).ratio()
+    return score if score >= score_cutoff else 0.0
+
+def _normalize_names(employees: List[Dict[str, Any]]) -> List[str]:
+    """Normalized developer_name of each employee, in order"""
+    return [_normalize_name(emp.get('developer_name') or '') for emp in employees]
+
 class NameMatcher:
     @staticmethod
     def normalize_name(name: str) -> str:
-        name = (name or "").lower().strip()
-        name = re.sub(r'[^\w\s]', '', name)
-        name = re.sub(r'\s+', ' ', name)
-        return name
+        return _normalize_name(name)
 
     @staticmethod
-    def similarity_score(name1: str, name2: str) -> float:
-        name1_norm = NameMatcher.normalize_name(name1)
-        name2_norm = NameMatcher.normalize_name(name2)
-
-        if Levenshtein:
-            try:
-                dist = Levenshtein.distance(name1_norm, name2_norm)
-                levenshtein_sim = 1 - (dist / max(len(name1_norm), len(name2_norm), 1))
-            except Exception:
-                levenshtein_sim = SequenceMatcher(None, name1_norm, name2_norm).ratio()
-        else:
-            levenshtein_sim = SequenceMatcher(None, name1_norm, name2_norm).ratio()
-
-        sequence_sim = SequenceMatcher(None, name1_norm, name2_norm).ratio()
-        combined_score = (levenshtein_sim * 0.6) + (sequence_sim * 0.4)
-        return combined_score
+    def similarity_score(name1: str, name2: str, threshold: float = 0.0) -> float:
+        return _similarity_norm(_normalize_name(name1), _normalize_name(name2), threshold)
 
     @staticmethod
     def extract_name_parts(full_name: str) -> Dict[str, str]:
         parts = (full_name or "").split()
-        if len(parts) == 0:
-            return {'first': '', 'last': ''}
-        if len(parts) == 1:
-            return {'first': parts[0], 'last': ''}
-        elif len(parts) == 2:
-            return {'first': parts[0], 'last': parts[1]}
-        else:
-            return {'first': parts[0], 'last': parts[-1]}
+        return {'first': parts[0] if parts else '', 'last': parts[-1] if len(parts) > 1 else ''}
 
     @staticmethod
-    def fuzzy_match_employee(search_name: str, employees: List[Dict[str, Any]], threshold: float = 0.6) -> List[Dict[str, Any]]:
+    def fuzzy_match_employee(search_name: str, employees: List[Dict[str, Any]], threshold: float = 0.6,
+                             norm_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         matches = []
-        search_parts = NameMatcher.extract_name_parts(search_name)
-
-        for emp in employees:
-            scores = []
-            emp_full_name = f"{emp.get('developer_name','')}".strip()
-            scores.append(NameMatcher.similarity_score(search_name, emp_full_name))
-
-            if ' ' in emp_full_name:
-                first_name = emp_full_name.split()[0]
-                last_name = ' '.join(emp_full_name.split()[1:])
-                scores.append(NameMatcher.similarity_score(search_name, f"{first_name} {last_name}"))
-                scores.append(NameMatcher.similarity_score(search_name, f"{last_name} {first_name}"))
-
-            if search_parts['last']:
-                first_score = NameMatcher.similarity_score(search_parts['first'], emp_full_name.split()[0] if emp_full_name else '')
-                last_score = NameMatcher.similarity_score(search_parts['last'], ' '.join(emp_full_name.split()[1:]) if ' ' in emp_full_name else '')
+        # normalize every name once up front (or take the caller's precomputed list);
+        # the loop below compares normalized strings only
+        search_norm = _normalize_name(search_name)
+        search_parts = NameMatcher.extract_name_parts(search_norm)
+        search_first = search_parts['first']
+        search_last = search_parts['last']
+        if norm_names is None:
+            norm_names = _normalize_names(employees)
+
+        for emp, emp_norm in zip(employees, norm_names):
+            emp_parts = emp_norm.split()
+            first_name = emp_parts[0] if emp_parts else ''
+            last_name = ' '.join(emp_parts[1:]) if len(emp_parts) > 1 else ''
+            scores = [_similarity_norm(search_norm, emp_norm, threshold - _FUZZY_PRUNE_MARGIN)]
+            # reordered/partial comparisons only rescue near misses; skip hopeless candidates
+            if scores[0] < threshold - _FUZZY_PRUNE_MARGIN:
+                continue
+
+            if last_name:
+                scores.append(_similarity_norm(search_norm, f"{first_name} {last_name}", threshold))
+                scores.append(_similarity_norm(search_norm, f"{last_name} {first_name}", threshold))
+
+            if search_last:
+                first_score = _similarity_norm(search_first, first_name)
+                last_score = _similarity_norm(search_last, last_name)
                 if first_score > 0 or last_score > 0:
                     scores.append((first_score + last_score) / 2)
 
@@ -463,102 +688,269 @@ class NameMatcher:
 # -------------------------------
 # Enhanced Employee Search with AI
 # -------------------------------
-def fetch_employees_ai(search_term: str = None, emp_id: int = None) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+_EMPLOYEE_SELECT = """
+    SELECT d.id, d.developer_name, d.designation, d.email_id, d.mobile, 
+           d.status, d.doj, d.emp_number, d.blood_group,
+           u.username, d.opening_leave_balance, d.is_pf_enabled, d.pf_join_date
+    FROM developer d
+    LEFT JOIN user u ON d.user_id = u.user_id
+"""
+
+# MySQL error raised when no FULLTEXT index covers the MATCH() column list
+_ER_FT_MATCHING_KEY_NOT_FOUND = 1191
+_fulltext_enabled = True
+_FT_SPLIT_RE = re.compile(r'\W+')
+
+# InnoDB's innodb_ft_min_token_size default; shorter words are never indexed
+_FT_MIN_TOKEN_LEN = 3
+
+def _fulltext_query(search_term: str) -> str:
+    """
+    Turn free text into a BOOLEAN MODE query requiring every word as a prefix.
+    Empty when a word is too short for the index, since such a query can never match.
+    """
+    words = [w for w in _FT_SPLIT_RE.split(search_term) if w]
+    if any(len(w) < _FT_MIN_TOKEN_LEN for w in words):
+        return ""
+    return " ".join(f"+{w}*" for w in words)
+
+# Narrows a search by designation/email/emp number/name; MySQL's default
+# collation makes the LIKE case-insensitive
+_CONTEXT_FILTER_SQL = """
+    AND (d.designation LIKE %(context)s OR d.email_id LIKE %(context)s
+         OR d.emp_number LIKE %(context)s OR d.developer_name LIKE %(context)s)
+"""
+
+def _context_filter(additional_context: Optional[str]):
+    """SQL fragment and named params restricting rows to the additional context (empty when none)"""
+    if not additional_context:
+        return "", {}
+    return _CONTEXT_FILTER_SQL, {"context": f"%{additional_context}%"}
+
+def _search_employees_fulltext(cursor, search_term: str, additional_context: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Index-backed search over idx_emp_search (see migrations/); [] when unavailable"""
+    global _fulltext_enabled
+    ft_query = _fulltext_query(search_term)
+    if not _fulltext_enabled or not ft_query:
+        return []
+    context_sql, context_params = _context_filter(additional_context)
     try:
-        if emp_id:
-            cursor.execute("""
-                SELECT d.id, d.developer_name, d.designation, d.email_id, d.mobile, 
-                       d.status, d.doj, d.emp_number, d.blood_group,
-                       u.username, d.opening_leave_balance, d.is_pf_enabled, d.pf_join_date
-                FROM developer d
-                LEFT JOIN user u ON d.user_id = u.user_id
-                WHERE d.id = %s
-            """, (emp_id,))
-        elif search_term:
-            cursor.execute("""
-                SELECT d.id, d.developer_name, d.designation, d.email_id, d.mobile, 
-                       d.status, d.doj, d.emp_number, d.blood_group,
-                       u.username, d.opening_leave_balance, d.is_pf_enabled, d.pf_join_date
-                FROM developer d
-                LEFT JOIN user u ON d.user_id = u.user_id
-                WHERE d.developer_name LIKE %s OR d.email_id LIKE %s 
-                   OR d.mobile LIKE %s OR d.emp_number LIKE %s
-                ORDER BY d.developer_name
-            """, (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-        else:
-            return []
-
-        rows = cursor.fetchall()
-
-        if search_term and not rows:
-            # fallback fuzzy search among active employees
-            cursor.execute("""
-                SELECT d.id, d.developer_name, d.designation, d.email_id, d.mobile, 
-                       d.status, d.doj, d.emp_number, d.blood_group,
-                       u.username, d.opening_leave_balance, d.is_pf_enabled, d.pf_join_date
-                FROM developer d
-                LEFT JOIN user u ON d.user_id = u.user_id
-                WHERE d.status = 1
-            """)
-            all_employees = cursor.fetchall()
-            fuzzy_matches = NameMatcher.fuzzy_match_employee(search_term, all_employees)
-            rows = [match['employee'] for match in fuzzy_matches[:5]]
+        cursor.execute(_EMPLOYEE_SELECT + """
+            WHERE MATCH(d.developer_name, d.email_id, d.emp_number, d.mobile) AGAINST (%(ft_query)s IN BOOLEAN MODE)
+        """ + context_sql + """
+            ORDER BY d.developer_name
+        """, {"ft_query": ft_query, **context_params})
+        return cursor.fetchall()
+    except mysql.connector.Error as e:
+        if e.errno == _ER_FT_MATCHING_KEY_NOT_FOUND:
+            _fulltext_enabled = False
+        logger.debug("FULLTEXT search unavailable, using LIKE: %s", e)
+        return []
+
+# seconds; never longer than CACHE_TTL_SECONDS, so setting that to 0 disables this cache too
+_ACTIVE_EMPLOYEES_TTL = min(60, CACHE_TTL_SECONDS)
+# rows plus a parallel list of their normalized names, built once per refresh
+_active_employees_cache: Dict[str, Any] = {"expires_at": 0.0, "rows": [], "norm_names": []}
+_active_employees_lock = threading.Lock()
+
+def _cached_active_employees() -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+    """(active employees, normalized names) if the cache is still fresh, otherwise None"""
+    with _active_employees_lock:
+        if time.monotonic() < _active_employees_cache["expires_at"]:
+            return _active_employees_cache["rows"], _active_employees_cache["norm_names"]
+    return None
+
+def _get_active_employees(cursor) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Active employees for the fuzzy fallback, re-read from the DB at most once per TTL window"""
+    cached = _cached_active_employees()
+    if cached is not None:
+        return cached
+    cursor.execute(_EMPLOYEE_SELECT + "WHERE d.status = 1")
+    rows = cursor.fetchall()
+    norm_names = _normalize_names(rows)
+    with _active_employees_lock:
+        _active_employees_cache["rows"] = rows
+        _active_employees_cache["norm_names"] = norm_names
+        _active_employees_cache["expires_at"] = time.monotonic() + _ACTIVE_EMPLOYEES_TTL
+    return rows, norm_names
+
+_NAME_LENGTH_SLACK = 3
+
+def _get_soundex_candidates(cursor, search_term: str) -> List[Dict[str, Any]]:
+    """
+    Active employees whose name sounds like the search term, or starts with the same
+    letter and has a similar length (coarse server-side prefilter for the fuzzy ranking)
+    """
+    term = search_term.strip()
+    # first letter as a LIKE prefix; wildcard characters would widen it to everyone
+    prefix = term[:1] if term[:1].isalnum() else ''
+    # a UNION rather than one OR, so each branch can use its own index
+    # (idx_dev_name_soundex and idx_dev_name, see migrations/)
+    sql = "(" + _EMPLOYEE_SELECT + "WHERE d.status = 1 AND SOUNDEX(d.developer_name) = SOUNDEX(%s))"
+    params = [term]
+    if prefix:
+        sql += " UNION (" + _EMPLOYEE_SELECT + """
+            WHERE d.status = 1 AND d.developer_name LIKE %s
+              AND ABS(CHAR_LENGTH(d.developer_name) - %s) <= %s)"""
+        params += [f"{prefix}%", len(term), _NAME_LENGTH_SLACK]
+    cursor.execute(sql, tuple(params))
+    return cursor.fetchall()
+
+def _fuzzy_top_matches(search_term: str, employees: List[Dict[str, Any]], limit: int = 5,
+                       norm_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Best fuzzy name matches among the given employees (norm_names: their precomputed normalized names)"""
+    if not employees:
+        return []
+    if norm_names is None:
+        norm_names = _normalize_names(employees)
+    if rf_process:
+        # token_sort_ratio ignores word order but, unlike token_set_ratio, doesn't score a
+        # name that is merely a subset of the query words ("ravi" for "ravi kumarr") at 100
+        results = rf_process.extract(NameMatcher.normalize_name(search_term), norm_names,
+                                     scorer=rf_fuzz.token_sort_ratio, limit=limit, score_cutoff=60)
+        return [employees[index] for _, _, index in results]
+    fuzzy_matches = NameMatcher.fuzzy_match_employee(search_term, employees, norm_names=norm_names)
+    return [match['employee'] for match in fuzzy_matches[:limit]]
+
+@ttl_cache()
+def fetch_employees_ai(search_term: str = None, emp_id: int = None, additional_context: str = None) -> List[Dict[str, Any]]:
+    """
+    Employees matching an id or search term. additional_context narrows the direct
+    matches in SQL and disables the fuzzy fallback (the caller retries without it).
+    """
+    try:
+        with db_cursor() as cursor:
+            if emp_id:
+                cursor.execute(_EMPLOYEE_SELECT + "WHERE d.id = %s", (emp_id,))
+                rows = cursor.fetchall()
+            elif search_term:
+                rows = _search_employees_fulltext(cursor, search_term, additional_context)
+                if not rows:
+                    # substring match still catches partial mobile/emp numbers the word index cannot
+                    context_sql, context_params = _context_filter(additional_context)
+                    cursor.execute(_EMPLOYEE_SELECT + """
+                        WHERE (d.developer_name LIKE %(like)s OR d.email_id LIKE %(like)s 
+                           OR d.mobile LIKE %(like)s OR d.emp_number LIKE %(like)s)
+                    """ + context_sql + """
+                        ORDER BY d.developer_name
+                    """, {"like": f"%{search_term}%", **context_params})
+                    rows = cursor.fetchall()
+            else:
+                return []
 
-        return rows
+            if search_term and not rows and not additional_context:
+                # fallback fuzzy search among active employees: always rank the SOUNDEX/prefix
+                # candidates first and widen to everyone only when none of them match, so the
+                # answer doesn't depend on whether the active-employee cache is warm
+                rows = _fuzzy_top_matches(search_term, _get_soundex_candidates(cursor, search_term))
+                if not rows:
+                    all_employees, all_names = _get_active_employees(cursor)
+                    rows = _fuzzy_top_matches(search_term, all_employees, norm_names=all_names)
+
+            return rows
 
     except Exception as e:
-        if DEBUG:
-            print(f"Database error: {e}")
+        logger.debug("Database error: %s", e)
         return []
-    finally:
-        cursor.close()
-        conn.close()
 
 # -------------------------------
 # Leave Management Functions
 # -------------------------------
+# Days charged per approved request by leave type; unknown types count as a full day
+_LEAVE_MULT = {
+    'FULL DAY': 1.0,
+    'HALF DAY': 0.5,
+    'COMPENSATION HALF DAY': 0.5,
+    '2 HRS': 0.25,
+    'COMPENSATION 2 HRS': 0.25,
+}
+# Same table as a SQL expression over leave_requests lr (0 for the LEFT JOIN's empty row)
+_LEAVE_DAYS_SQL = "CASE WHEN lr.request_id IS NULL THEN 0 " + " ".join(
+    f"WHEN UPPER(lr.leave_type) = '{leave_type}' THEN {mult}" for leave_type, mult in _LEAVE_MULT.items()
+) + " ELSE 1 END"
+
+# One round trip: developer row joined with approved leaves, weighted per leave type in SQL
+_LEAVE_BALANCE_SQL = """
+    SELECT d.opening_leave_balance, lr.leave_type, COUNT(lr.request_id) AS count,
+           COALESCE(SUM(""" + _LEAVE_DAYS_SQL + """), 0) AS days
+    FROM developer d
+    LEFT JOIN leave_requests lr ON lr.developer_id = d.id AND lr.status = 'Approved'
+    WHERE d.id = %s
+    GROUP BY d.id, lr.leave_type
+"""
+
+# task/description are only ever shown as 120-char previews; fetching 121 chars
+# keeps the "..." check (len > 120) working without transferring the full text
+_WORK_REPORT_SQL = """
+    SELECT LEFT(wr.task, 121) AS task, LEFT(wr.description, 121) AS description,
+           wr.date, wr.total_time, 
+           p.title as project_name, c.client_name
+    FROM work_report wr
+    LEFT JOIN project p ON wr.project_id = p.id
+    LEFT JOIN client c ON wr.client_id = c.id
+    WHERE wr.developer_id = %s 
+    AND wr.date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+    ORDER BY wr.date DESC
+    LIMIT 100
+"""
+
+_LEAVE_REQUESTS_SQL = """
+    SELECT request_id, leave_type, date_of_leave, status, 
+           dev_comments, admin_comments, created_at
+    FROM leave_requests 
+    WHERE developer_id = %s 
+    ORDER BY date_of_leave DESC
+    LIMIT %s
+"""
+
+_LEAVE_STATUS_COUNTS_SQL = """
+    SELECT status, COUNT(*) AS count
+    FROM leave_requests
+    WHERE developer_id = %s
+    GROUP BY status
+"""
+
+_APPRAISAL_FEEDBACK_SQL = """
+    SELECT project_name, feedback_type, date_of_incident, comments
+    FROM appraisal_feedback
+    WHERE developer_id = %s
+    ORDER BY date_of_incident DESC
+    LIMIT %s
+"""
+
+_INCENTIVES_SQL = """
+    SELECT ie.id, ie.incentive, ie.remarks, ps.project_name, ie.added_at
+    FROM incentive_earned ie
+    LEFT JOIN project_settings ps ON ie.project_settings_id = ps.id
+    WHERE ie.user_id = %s
+    ORDER BY ie.added_at DESC
+    LIMIT 10
+"""
+
+_INCENTIVE_TOTALS_SQL = """
+    SELECT COUNT(*) AS entries, COALESCE(SUM(incentive), 0) AS total
+    FROM incentive_earned
+    WHERE user_id = %s
+"""
+
+@ttl_cache(should_cache=lambda result: 'error' not in result)
 def get_leave_balance_for_employee(developer_id: int) -> Dict[str, Any]:
     """Calculate leave balance for an employee"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT opening_leave_balance, doj, status 
-            FROM developer 
-            WHERE id = %s
-        """, (developer_id,))
-        developer_info = cursor.fetchone()
-        
-        if not developer_info:
+        with db_cursor() as cursor:
+            cursor.execute(_LEAVE_BALANCE_SQL, (developer_id,))
+            rows = cursor.fetchall()
+
+        if not rows:
             return {"error": "Employee not found"}
-        
-        cursor.execute("""
-            SELECT leave_type, COUNT(*) as count
-            FROM leave_requests 
-            WHERE developer_id = %s AND status = 'Approved'
-            GROUP BY leave_type
-        """, (developer_id,))
-        leave_counts = cursor.fetchall()
-        
-        used_leaves = 0.0
-        for leave in leave_counts:
-            lt = (leave.get('leave_type') or '').upper()
-            cnt = float(leave.get('count') or 0)
-            if lt == 'FULL DAY':
-                used_leaves += cnt
-            elif lt in ['HALF DAY', 'COMPENSATION HALF DAY']:
-                used_leaves += cnt * 0.5
-            elif lt in ['2 HRS', 'COMPENSATION 2 HRS']:
-                used_leaves += cnt * 0.25
-            else:
-                # default treat as full day for unknown types
-                used_leaves += cnt
+
+        developer_info = rows[0]
+        leave_counts = [r for r in rows if r.get('count')]
+        used_leaves = sum(float(r.get('days') or 0) for r in leave_counts)
 
         opening_balance = float(developer_info.get('opening_leave_balance') or 0)
         current_balance = opening_balance - used_leaves
-        
+    
         return {
             "opening_balance": opening_balance,
             "used_leaves": used_leaves,
@@ -568,82 +960,113 @@ def get_leave_balance_for_employee(developer_id: int) -> Dict[str, Any]:
         
     except Exception as e:
         return {"error": f"Error calculating leave balance: {str(e)}"}
-    finally:
-        cursor.close()
-        conn.close()
+
+def get_leave_balances_bulk(developer_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Leave balances for many employees in one query, keyed by developer id ({} on error)"""
+    if not developer_ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(developer_ids))
+    try:
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT d.id, d.opening_leave_balance,
+                       COALESCE(SUM(""" + _LEAVE_DAYS_SQL + """), 0) AS used_leaves
+                FROM developer d
+                LEFT JOIN leave_requests lr ON lr.developer_id = d.id AND lr.status = 'Approved'
+                WHERE d.id IN (""" + placeholders + """)
+                GROUP BY d.id, d.opening_leave_balance
+            """, tuple(developer_ids))
+
+            balances = {}
+            for row in cursor.fetchall():
+                opening_balance = float(row.get('opening_leave_balance') or 0)
+                used_leaves = float(row.get('used_leaves') or 0)
+                balances[row['id']] = {
+                    "opening_balance": opening_balance,
+                    "used_leaves": used_leaves,
+                    "current_balance": opening_balance - used_leaves,
+                }
+            return balances
+
+    except Exception as e:
+        logger.debug("Error calculating leave balances: %s", e)
+        return {}
 
 def get_employee_work_report(developer_id: int, days: int = 30) -> List[Dict[str, Any]]:
     """Get recent work reports for an employee"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT wr.task, wr.description, wr.date, wr.total_time, 
-                   p.title as project_name, c.client_name
-            FROM work_report wr
-            LEFT JOIN project p ON wr.project_id = p.id
-            LEFT JOIN client c ON wr.client_id = c.id
-            WHERE wr.developer_id = %s 
-            AND wr.date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
-            ORDER BY wr.date DESC
-            LIMIT 100
-        """, (developer_id, days))
-        
-        return cursor.fetchall()
-        
+        with db_cursor() as cursor:
+            cursor.execute(_WORK_REPORT_SQL, (developer_id, days))
+            return cursor.fetchall()
     except Exception as e:
-        if DEBUG:
-            print(f"Error fetching work report: {e}")
+        logger.debug("Error fetching work report: %s", e)
         return []
-    finally:
-        cursor.close()
-        conn.close()
 
 def get_employee_leave_requests(developer_id: int, limit: int = 100) -> List[Dict[str, Any]]:
     """Get leave requests for an employee"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT request_id, leave_type, date_of_leave, status, 
-                   dev_comments, admin_comments, created_at
-            FROM leave_requests 
-            WHERE developer_id = %s 
-            ORDER BY date_of_leave DESC
-            LIMIT %s
-        """, (developer_id, limit))
-        
-        return cursor.fetchall()
-        
+        with db_cursor() as cursor:
+            cursor.execute(_LEAVE_REQUESTS_SQL, (developer_id, limit))
+            return cursor.fetchall()
     except Exception as e:
-        if DEBUG:
-            print(f"Error fetching leave requests: {e}")
+        logger.debug("Error fetching leave requests: %s", e)
         return []
-    finally:
-        cursor.close()
-        conn.close()
+
+def get_employee_leave_status_counts(developer_id: int) -> Dict[str, int]:
+    """Number of leave requests per status over the employee's whole history"""
+    try:
+        with db_cursor() as cursor:
+            cursor.execute(_LEAVE_STATUS_COUNTS_SQL, (developer_id,))
+            return {row['status']: int(row['count']) for row in cursor.fetchall()}
+    except Exception as e:
+        logger.debug("Error counting leave requests: %s", e)
+        return {}
+
+# The three per-employee lookups in get_employee_details run side by side,
+# each on its own pooled connection. Shared by concurrent calls, so it is sized
+# to the pool rather than to one call's three lookups.
+_detail_executor = ThreadPoolExecutor(max_workers=_DB_POOL_SIZE, thread_name_prefix="emp-details")
 
 # -------------------------------
 # Employee Formatting and Resolution
 # -------------------------------
+@lru_cache(maxsize=1024)
+def _format_employee_option(name, designation, email_id, emp_number, mobile, status) -> str:
+    fields = [f"👤 {name}"]
+    if designation:
+        fields.append(f"💼 {designation}")
+    if email_id:
+        fields.append(f"📧 {email_id}")
+    if emp_number:
+        fields.append(f"🆔 {emp_number}")
+    if mobile:
+        fields.append(f"📞 {mobile}")
+    fields.append(f"🔰 {'Active' if status == 1 else 'Inactive'}")
+    return " | ".join(fields)
+
 def format_employee_options(employees: List[Dict[str, Any]]) -> str:
-    options = []
-    for i, emp in enumerate(employees, 1):
-        option = f"{i}. 👤 {emp.get('developer_name','Unknown')}"
-        if emp.get('designation'):
-            option += f" | 💼 {emp.get('designation')}"
-        if emp.get('email_id'):
-            option += f" | 📧 {emp.get('email_id')}"
-        if emp.get('emp_number'):
-            option += f" | 🆔 {emp.get('emp_number')}"
-        if emp.get('mobile'):
-            option += f" | 📞 {emp.get('mobile')}"
-        status = "Active" if emp.get('status') == 1 else "Inactive"
-        option += f" | 🔰 {status}"
-        options.append(option)
-    return "\n".join(options)
+    # each line is memoized on the values it shows, so an edited record never
+    # reuses a stale line and the same ambiguous candidates format only once
+    return "\n".join(
+        f"{i}. " + _format_employee_option(
+            emp.get('developer_name', 'Unknown'), emp.get('designation'), emp.get('email_id'),
+            emp.get('emp_number'), emp.get('mobile'), emp.get('status'),
+        )
+        for i, emp in enumerate(employees, 1)
+    )
 
+# Tools are often called back to back for the same person; reuse the resolution,
+# ignoring case/whitespace differences in the name. Misses aren't cached.
+@ttl_cache(maxsize=512,
+           should_cache=lambda result: result['status'] != 'not_found',
+           key=lambda search_name, additional_context=None: ((search_name or '').strip().lower(), additional_context or ''))
 def resolve_employee_ai(search_name: str, additional_context: str = None) -> Dict[str, Any]:
+    if additional_context:
+        # let MySQL apply the context first; a single hit settles it in one query
+        narrowed = fetch_employees_ai(search_term=search_name, additional_context=additional_context)
+        if len(narrowed) == 1:
+            return {'status': 'resolved', 'employee': narrowed[0]}
+
     employees = fetch_employees_ai(search_term=search_name)
 
     if not employees:
@@ -653,6 +1076,7 @@ def resolve_employee_ai(search_name: str, additional_context: str = None) -> Dic
         return {'status': 'resolved', 'employee': employees[0]}
 
     if additional_context:
+        # only fuzzy matches can still be narrowed here; direct matches were filtered in SQL above
         context_lower = (additional_context or '').lower()
         filtered_employees = []
         for emp in employees:
@@ -690,28 +1114,35 @@ def generate_api_key() -> str:
 @mcp.tool()
 def check_auth_status() -> str:
     """Check current authentication configuration"""
-    status = "🔐 **Authentication Status**\n\n"
-    status += f"API Key Required: {'✅ Yes' if REQUIRE_API_KEY else '❌ No'}\n"
+    parts = ["🔐 **Authentication Status**\n\n"]
+    parts.append(f"API Key Required: {'✅ Yes' if REQUIRE_API_KEY else '❌ No'}\n")
     
     if REQUIRE_API_KEY:
         key_count = len(VALID_API_KEYS)
-        status += f"Configured API Keys: {key_count}\n"
+        parts.append(f"Configured API Keys: {key_count}\n")
         if key_count == 0:
-            status += "⚠️ Warning: No API keys configured but authentication is required!\n"
+            parts.append("⚠️ Warning: No API keys configured but authentication is required!\n")
     
-    status += f"Scanner Mode: {'✅ Enabled' if SCANNER_MODE else '❌ Disabled'}\n"
-    status += f"Debug Mode: {'✅ Enabled' if DEBUG else '❌ Disabled'}\n"
-    status += f"\n**Usage:**\n"
-    status += "- Header: `Authorization: Bearer <api_key>`\n"
-    status += "- Header: `X-API-Key: <api_key>`\n"
-    status += "- Query: `?api_key=<api_key>`\n"
+    parts.append(f"Scanner Mode: {'✅ Enabled' if SCANNER_MODE else '❌ Disabled'}\n")
+    parts.append(f"Debug Mode: {'✅ Enabled' if DEBUG else '❌ Disabled'}\n")
+    parts.append(f"\n**Usage:**\n")
+    parts.append("- Header: `Authorization: Bearer <api_key>`\n")
+    parts.append("- Header: `X-API-Key: <api_key>`\n")
+    parts.append("- Query: `?api_key=<api_key>`\n")
     
-    return status
+    return "".join(parts)
+
+@mcp.tool()
+def clear_cache() -> str:
+    """Clear cached employee lookups, leave balances and company reference data so the next call reads fresh data"""
+    cleared = clear_result_caches()
+    return f"🧹 **Cache Cleared**\n\nCleared {cleared} caches. The next lookups will read fresh data from the database."
 
 # -------------------------------
 # HR Tools (All protected by middleware)
 # -------------------------------
 @mcp.tool()
+@run_in_thread
 def get_employee_details(name: str, additional_context: Optional[str] = None) -> str:
     """Get comprehensive details for an employee including personal info, leave balance, and recent activity"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -725,47 +1156,51 @@ def get_employee_details(name: str, additional_context: Optional[str] = None) ->
 
     emp = resolution['employee']
     
-    # Get additional information
-    leave_balance = get_leave_balance_for_employee(emp['id'])
-    work_reports = get_employee_work_report(emp['id'], days=7)
-    leave_requests = get_employee_leave_requests(emp['id'], limit=10)
+    # Get additional information concurrently
+    balance_future = _detail_executor.submit(get_leave_balance_for_employee, emp['id'])
+    work_future = _detail_executor.submit(get_employee_work_report, emp['id'], days=7)
+    leaves_future = _detail_executor.submit(get_employee_leave_requests, emp['id'], limit=10)
+    leave_balance = balance_future.result()
+    work_reports = work_future.result()
+    leave_requests = leaves_future.result()
     
-    response = f"✅ **Employee Details**\n\n"
-    response += f"👤 **{emp['developer_name']}**\n"
-    response += f"🆔 Employee ID: {emp['id']} | Employee #: {emp.get('emp_number', 'N/A')}\n"
-    response += f"💼 Designation: {emp.get('designation', 'N/A')}\n"
-    response += f"📧 Email: {emp.get('email_id', 'N/A')}\n"
-    response += f"📞 Mobile: {emp.get('mobile', 'N/A')}\n"
-    response += f"🩸 Blood Group: {emp.get('blood_group', 'N/A')}\n"
-    response += f"📅 Date of Joining: {emp.get('doj', 'N/A')}\n"
-    response += f"🔰 Status: {'Active' if emp.get('status') == 1 else 'Inactive'}\n\n"
+    parts = [f"✅ **Employee Details**\n\n"]
+    parts.append(f"👤 **{emp['developer_name']}**\n")
+    parts.append(f"🆔 Employee ID: {emp['id']} | Employee #: {emp.get('emp_number', 'N/A')}\n")
+    parts.append(f"💼 Designation: {emp.get('designation', 'N/A')}\n")
+    parts.append(f"📧 Email: {emp.get('email_id', 'N/A')}\n")
+    parts.append(f"📞 Mobile: {emp.get('mobile', 'N/A')}\n")
+    parts.append(f"🩸 Blood Group: {emp.get('blood_group', 'N/A')}\n")
+    parts.append(f"📅 Date of Joining: {emp.get('doj', 'N/A')}\n")
+    parts.append(f"🔰 Status: {'Active' if emp.get('status') == 1 else 'Inactive'}\n\n")
     
     # Leave Balance
     if 'error' not in leave_balance:
-        response += f"📊 **Leave Balance:** {leave_balance['current_balance']:.1f} days\n"
-        response += f"   - Opening Balance: {leave_balance['opening_balance']}\n"
-        response += f"   - Leaves Used: {leave_balance['used_leaves']:.1f} days\n\n"
+        parts.append(f"📊 **Leave Balance:** {leave_balance['current_balance']:.1f} days\n")
+        parts.append(f"   - Opening Balance: {leave_balance['opening_balance']}\n")
+        parts.append(f"   - Leaves Used: {leave_balance['used_leaves']:.1f} days\n\n")
     else:
-        response += f"📊 Leave Balance: Data not available\n\n"
+        parts.append(f"📊 Leave Balance: Data not available\n\n")
     
     # Recent Work Reports
     if work_reports:
-        response += f"📋 **Recent Work (Last 7 days):**\n"
+        parts.append(f"📋 **Recent Work (Last 7 days):**\n")
         for report in work_reports[:3]:
             hours = (report['total_time'] or 0) / 3600 if report.get('total_time') else 0
-            response += f"   - {report['date']}: {report['task'][:60]}... ({hours:.1f}h)\n"
-        response += "\n"
+            parts.append(f"   - {report['date']}: {report['task'][:60]}... ({hours:.1f}h)\n")
+        parts.append("\n")
     
     # Recent Leave Requests
     if leave_requests:
-        response += f"🏖️  **Recent Leave Requests:**\n"
+        parts.append(f"🏖️  **Recent Leave Requests:**\n")
         for leave in leave_requests[:3]:
             status_icon = "✅" if leave['status'] == 'Approved' else "⏳" if leave['status'] in ['Requested', 'Pending'] else "❌"
-            response += f"   - {leave['date_of_leave']}: {leave['leave_type']} {status_icon}\n"
+            parts.append(f"   - {leave['date_of_leave']}: {leave['leave_type']} {status_icon}\n")
     
-    return response
+    return "".join(parts)
 
 @mcp.tool()
+@run_in_thread
 def get_leave_balance(name: str, additional_context: Optional[str] = None) -> str:
     """Get detailed leave balance information for an employee"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -783,25 +1218,25 @@ def get_leave_balance(name: str, additional_context: Optional[str] = None) -> st
     if 'error' in leave_balance:
         return f"❌ Error retrieving leave balance for {emp['developer_name']}: {leave_balance['error']}"
     
-    response = f"📊 **Leave Balance for {emp['developer_name']}**\n\n"
-    response += f"💼 Designation: {emp.get('designation', 'N/A')}\n"
-    response += f"📧 Email: {emp.get('email_id', 'N/A')}\n\n"
+    parts = [f"📊 **Leave Balance for {emp['developer_name']}**\n\n"]
+    parts.append(f"💼 Designation: {emp.get('designation', 'N/A')}\n")
+    parts.append(f"📧 Email: {emp.get('email_id', 'N/A')}\n\n")
     
-    response += f"💰 **Current Balance:** {leave_balance['current_balance']:.1f} days\n"
-    response += f"📥 Opening Balance: {leave_balance['opening_balance']} days\n"
-    response += f"📤 Leaves Used: {leave_balance['used_leaves']:.1f} days\n\n"
+    parts.append(f"💰 **Current Balance:** {leave_balance['current_balance']:.1f} days\n")
+    parts.append(f"📥 Opening Balance: {leave_balance['opening_balance']} days\n")
+    parts.append(f"📤 Leaves Used: {leave_balance['used_leaves']:.1f} days\n\n")
     
     if leave_balance['leave_details']:
-        response += f"📋 **Breakdown of Used Leaves:**\n"
+        parts.append(f"📋 **Breakdown of Used Leaves:**\n")
         for leave in leave_balance['leave_details']:
-            lt = (leave.get('leave_type') or '').upper()
-            days_equiv = 1.0 if lt == 'FULL DAY' else 0.5 if lt in ['HALF DAY','COMPENSATION HALF DAY'] else 0.25 if lt in ['2 HRS','COMPENSATION 2 HRS'] else 1.0
-            total_days = float(leave.get('count') or 0) * days_equiv
-            response += f"   - {leave['leave_type']}: {leave['count']} times ({total_days:.1f} days)\n"
+            # weighted per leave type in SQL (see _LEAVE_DAYS_SQL)
+            total_days = float(leave.get('days') or 0)
+            parts.append(f"   - {leave['leave_type']}: {leave['count']} times ({total_days:.1f} days)\n")
     
-    return response
+    return "".join(parts)
 
 @mcp.tool()
+@run_in_thread
 def get_work_report(name: str, days: int = 7, additional_context: Optional[str] = None) -> str:
     """Get work report for an employee for specified number of days"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -816,33 +1251,38 @@ def get_work_report(name: str, days: int = 7, additional_context: Optional[str]
     emp = resolution['employee']
     work_reports = get_employee_work_report(emp['id'], days)
     
-    response = f"📋 **Work Report for {emp['developer_name']}**\n"
-    response += f"💼 Designation: {emp.get('designation', 'N/A')}\n"
-    response += f"📅 Period: Last {days} days\n\n"
+    parts = [f"📋 **Work Report for {emp['developer_name']}**\n"]
+    parts.append(f"💼 Designation: {emp.get('designation', 'N/A')}\n")
+    parts.append(f"📅 Period: Last {days} days\n\n")
     
     if not work_reports:
-        response += "No work reports found for the specified period."
-        return response
+        parts.append("No work reports found for the specified period.")
+        return "".join(parts)
     
     total_hours = 0.0
+    append = parts.append
     for report in work_reports:
-        hours = (report['total_time'] or 0) / 3600 if report.get('total_time') else 0.0
+        total_time = report.get('total_time')
+        hours = total_time / 3600 if total_time else 0.0
         total_hours += hours
+        task = report.get('task') or ''
+        description = report.get('description')
         
-        response += f"**{report['date']}** - {report.get('project_name', 'No Project')}\n"
-        response += f"Client: {report.get('client_name', 'N/A')}\n"
-        response += f"Task: {report['task'][:120]}{'...' if len(report.get('task','')) > 120 else ''}\n"
-        if report.get('description'):
-            response += f"Details: {report['description'][:120]}{'...' if len(report.get('description','')) > 120 else ''}\n"
-        response += f"Hours: {hours:.1f}h\n"
-        response += "---\n"
+        append(f"**{report['date']}** - {report.get('project_name', 'No Project')}\n")
+        append(f"Client: {report.get('client_name', 'N/A')}\n")
+        append(f"Task: {task[:120]}{'...' if len(task) > 120 else ''}\n")
+        if description:
+            append(f"Details: {description[:120]}{'...' if len(description) > 120 else ''}\n")
+        append(f"Hours: {hours:.1f}h\n")
+        append("---\n")
     
-    response += f"\n**Total Hours ({days} days): {total_hours:.1f}h**\n"
-    response += f"Average per day: { (total_hours/days):.1f}h" if days > 0 else ""
+    parts.append(f"\n**Total Hours ({days} days): {total_hours:.1f}h**\n")
+    parts.append(f"Average per day: { (total_hours/days):.1f}h" if days > 0 else "")
     
-    return response
+    return "".join(parts)
 
 @mcp.tool()
+@run_in_thread
 def get_leave_history(name: str, additional_context: Optional[str] = None) -> str:
     """Get leave history for an employee"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -855,33 +1295,69 @@ def get_leave_history(name: str, additional_context: Optional[str] = None) -> st
         return f"🔍 {resolution['message']}\n\n{options_text}"
 
     emp = resolution['employee']
-    leave_requests = get_employee_leave_requests(emp['id'], limit=100)
+    # counts come from a GROUP BY; only the rows actually listed are fetched
+    leave_requests = get_employee_leave_requests(emp['id'], limit=40)
     
-    response = f"🏖️  **Leave History for {emp['developer_name']}**\n"
-    response += f"💼 Designation: {emp.get('designation', 'N/A')}\n\n"
+    parts = [f"🏖️  **Leave History for {emp['developer_name']}**\n"]
+    parts.append(f"💼 Designation: {emp.get('designation', 'N/A')}\n\n")
     
     if not leave_requests:
-        response += "No leave requests found."
-        return response
+        parts.append("No leave requests found.")
+        return "".join(parts)
     
-    approved_count = sum(1 for lr in leave_requests if lr['status'] == 'Approved')
-    pending_count = sum(1 for lr in leave_requests if lr['status'] in ['Requested', 'Pending'])
-    declined_count = sum(1 for lr in leave_requests if lr['status'] == 'Declined')
+    status_counts = get_employee_leave_status_counts(emp['id'])
+    approved_count = status_counts.get('Approved', 0)
+    pending_count = status_counts.get('Requested', 0) + status_counts.get('Pending', 0)
+    declined_count = status_counts.get('Declined', 0)
     
-    response += f"📊 Summary: {approved_count} Approved, {pending_count} Pending, {declined_count} Declined\n\n"
+    parts.append(f"📊 Summary: {approved_count} Approved, {pending_count} Pending, {declined_count} Declined\n\n")
     
-    for leave in leave_requests[:40]:
-        status_icon = "✅" if leave['status'] == 'Approved' else "⏳" if leave['status'] in ['Requested', 'Pending'] else "❌"
-        response += f"**{leave['date_of_leave']}** - {leave['leave_type']} {status_icon}\n"
-        if leave.get('dev_comments'):
-            response += f"Reason: {leave['dev_comments']}\n"
-        if leave.get('admin_comments') and leave['status'] != 'Pending':
-            response += f"Admin Note: {leave['admin_comments']}\n"
-        response += "---\n"
+    append = parts.append
+    for leave in leave_requests:
+        status = leave['status']
+        dev_comments = leave.get('dev_comments')
+        admin_comments = leave.get('admin_comments')
+        status_icon = "✅" if status == 'Approved' else "⏳" if status in ('Requested', 'Pending') else "❌"
+        append(f"**{leave['date_of_leave']}** - {leave['leave_type']} {status_icon}\n")
+        if dev_comments:
+            append(f"Reason: {dev_comments}\n")
+        if admin_comments and status != 'Pending':
+            append(f"Admin Note: {admin_comments}\n")
+        append("---\n")
     
-    return response
+    return "".join(parts)
+
+# -------------------------------
+# Row templates for the listing tools (one format_map per row)
+# -------------------------------
+class _RowView(dict):
+    """Row copy for str.format_map: columns missing from a row render as 'N/A'."""
+    def __missing__(self, key):
+        return 'N/A'
+
+_SEARCH_RESULT_ROW = (
+    "{i}. **{developer_name}**\n"
+    "   💼 {designation}\n"
+    "   📧 {email_id}\n"
+    "   📞 {mobile}\n"
+    "   🆔 {emp_number}\n"
+    "   🔰 {active}\n"
+)
+
+_CLIENT_ROW = (
+    "• {client_name} — {company_name}\n"
+    "   Contact: {contact_person} — {email_id} — {phone}\n"
+    "   Status: {active}\n\n"
+)
+
+_PROJECT_ROW = (
+    "📌 {title} (ID: {id})\n"
+    "   Client: {client_name} — {email_id}\n"
+    "   Status: {active}\n\n"
+)
 
 @mcp.tool()
+@run_in_thread
 def search_employees(search_query: str) -> str:
     """Search for employees by name, designation, email, or employee number"""
     employees = fetch_employees_ai(search_term=search_query)
@@ -889,29 +1365,28 @@ def search_employees(search_query: str) -> str:
     if not employees:
         return f"❌ No employees found matching '{search_query}'"
     
-    response = f"🔍 **Search Results for '{search_query}':**\n\n"
+    parts = [f"🔍 **Search Results for '{search_query}':**\n\n"]
+    # one query for every result's leave balance instead of one per employee
+    leave_balances = get_leave_balances_bulk([emp['id'] for emp in employees])
     
     for i, emp in enumerate(employees, 1):
-        response += f"{i}. **{emp['developer_name']}**\n"
-        response += f"   💼 {emp.get('designation', 'N/A')}\n"
-        response += f"   📧 {emp.get('email_id', 'N/A')}\n"
-        response += f"   📞 {emp.get('mobile', 'N/A')}\n"
-        response += f"   🆔 {emp.get('emp_number', 'N/A')}\n"
-        response += f"   🔰 {'Active' if emp.get('status') == 1 else 'Inactive'}\n"
+        parts.append(_SEARCH_RESULT_ROW.format_map(
+            _RowView(emp, i=i, active='Active' if emp.get('status') == 1 else 'Inactive')))
         
-        # Get quick leave balance
-        try:
-            leave_balance = get_leave_balance_for_employee(emp['id'])
-            if 'error' not in leave_balance:
-                response += f"   📊 Leave Balance: {leave_balance['current_balance']:.1f} days\n"
-        except Exception:
-            pass
+        # Quick leave balance
+        leave_balance = leave_balances.get(emp['id'])
+        if leave_balance:
+            parts.append(f"   📊 Leave Balance: {leave_balance['current_balance']:.1f} days\n")
         
-        response += "\n"
+        parts.append("\n")
     
-    return response
+    return "".join(parts)
+
+# HR document image columns reported by get_employee_profile
+DOC_KEYS = ('pan_front', 'pan_back', 'aadhar_front', 'aadhar_back', 'degree_front', 'degree_back')
 
 @mcp.tool()
+@run_in_thread
 def get_employee_profile(name: str, additional_context: Optional[str] = None) -> str:
     """Return extended HR profile (documents, PF status, confirmation, etc.)"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -922,37 +1397,34 @@ def get_employee_profile(name: str, additional_context: Optional[str] = None) ->
 
     emp = resolution['employee']
     # Build profile
-    response = f"📇 **HR Profile: {emp['developer_name']}**\n"
-    response += f"🆔 ID: {emp['id']}  |  Emp#: {emp.get('emp_number','N/A')}\n"
-    response += f"💼 Designation: {emp.get('designation','N/A')}\n"
-    response += f"📅 DOJ: {emp.get('doj','N/A')}  |  Confirmation Date: {emp.get('confirmation_date','N/A') if 'confirmation_date' in emp else 'N/A'}\n"
-    response += f"🏥 PF Enabled: {'Yes' if emp.get('is_pf_enabled') in [1,'1',True] else 'No'}\n"
-    response += f"📧 Work Email: {emp.get('email_id','N/A')}  |  Personal Email: {emp.get('personal_emaill','N/A') if 'personal_emaill' in emp else 'N/A'}\n"
-    response += f"📞 Mobile: {emp.get('mobile','N/A')}  |  Emergency Contact: {emp.get('emergency_contact_name','N/A')} ({emp.get('emergency_contact_no','N/A')})\n\n"
+    parts = [f"📇 **HR Profile: {emp['developer_name']}**\n"]
+    parts.append(f"🆔 ID: {emp['id']}  |  Emp#: {emp.get('emp_number','N/A')}\n")
+    parts.append(f"💼 Designation: {emp.get('designation','N/A')}\n")
+    parts.append(f"📅 DOJ: {emp.get('doj','N/A')}  |  Confirmation Date: {emp.get('confirmation_date','N/A') if 'confirmation_date' in emp else 'N/A'}\n")
+    parts.append(f"🏥 PF Enabled: {'Yes' if emp.get('is_pf_enabled') in [1,'1',True] else 'No'}\n")
+    parts.append(f"📧 Work Email: {emp.get('email_id','N/A')}  |  Personal Email: {emp.get('personal_emaill','N/A') if 'personal_emaill' in emp else 'N/A'}\n")
+    parts.append(f"📞 Mobile: {emp.get('mobile','N/A')}  |  Emergency Contact: {emp.get('emergency_contact_name','N/A')} ({emp.get('emergency_contact_no','N/A')})\n\n")
 
     # Documents urls if present (show placeholders)
-    doc_keys = ['pan_front','pan_back','aadhar_front','aadhar_back','degree_front','degree_back']
-    docs_present = []
-    for k in doc_keys:
-        if emp.get(k):
-            docs_present.append(k)
+    docs_present = [k for k in DOC_KEYS if emp.get(k)]
     if docs_present:
-        response += f"🗂️ Documents available: {', '.join(docs_present)}\n"
+        parts.append(f"🗂️ Documents available: {', '.join(docs_present)}\n")
     else:
-        response += "🗂️ No HR document images found.\n"
+        parts.append("🗂️ No HR document images found.\n")
 
     # Opening leave + PF join date
     if 'opening_leave_balance' in emp:
         try:
-            response += f"📊 Opening Leave Balance: {float(emp.get('opening_leave_balance') or 0):.1f} days\n"
+            parts.append(f"📊 Opening Leave Balance: {float(emp.get('opening_leave_balance') or 0):.1f} days\n")
         except Exception:
             pass
     if emp.get('pf_join_date'):
-        response += f"📌 PF Join Date: {emp.get('pf_join_date')}\n"
+        parts.append(f"📌 PF Join Date: {emp.get('pf_join_date')}\n")
 
-    return response
+    return "".join(parts)
 
 @mcp.tool()
+@run_in_thread
 def get_appraisal_feedback(name: str, additional_context: Optional[str] = None, limit: int = 5) -> str:
     """Get recent positive/negative feedback for an employee"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -962,36 +1434,27 @@ def get_appraisal_feedback(name: str, additional_context: Optional[str] = None,
         return f"❌ No employee found matching '{name}'"
 
     emp = resolution['employee']
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT project_name, feedback_type, date_of_incident, comments
-            FROM appraisal_feedback
-            WHERE developer_id = %s
-            ORDER BY date_of_incident DESC
-            LIMIT %s
-        """, (emp['id'], int(limit)))
-        feedbacks = cursor.fetchall()
+        with db_cursor() as cursor:
+            cursor.execute(_APPRAISAL_FEEDBACK_SQL, (emp['id'], int(limit)))
+            feedbacks = cursor.fetchall()
 
         if not feedbacks:
             return f"ℹ️ No appraisal feedback found for {emp['developer_name']}."
 
-        response = f"🗂️ **Appraisal Feedback for {emp['developer_name']}**\n\n"
+        parts = [f"🗂️ **Appraisal Feedback for {emp['developer_name']}**\n\n"]
         for fb in feedbacks:
             icon = "👍" if (fb.get('feedback_type') or "").upper() == "POSITIVE" else "👎"
-            response += f"{icon} **{fb.get('project_name','-')}** ({fb.get('date_of_incident','-')})\n"
+            parts.append(f"{icon} **{fb.get('project_name','-')}** ({fb.get('date_of_incident','-')})\n")
             if fb.get('comments'):
-                response += f"💬 {fb.get('comments')}\n"
-            response += "---\n"
-        return response
+                parts.append(f"💬 {fb.get('comments')}\n")
+            parts.append("---\n")
+        return "".join(parts)
     except Exception as e:
         return f"❌ Error fetching appraisal feedback: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_incentives(name: str, additional_context: Optional[str] = None) -> str:
     """Retrieve incentive earnings for an employee"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -1001,36 +1464,32 @@ def get_incentives(name: str, additional_context: Optional[str] = None) -> str:
         return f"❌ No employee found matching '{name}'"
 
     emp = resolution['employee']
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT ie.id, ie.incentive, ie.remarks, ps.project_name, ie.added_at
-            FROM incentive_earned ie
-            LEFT JOIN project_settings ps ON ie.project_settings_id = ps.id
-            WHERE ie.user_id = %s
-            ORDER BY ie.added_at DESC
-            LIMIT 20
-        """, (emp['id'],))
-        rows = cursor.fetchall()
-        if not rows:
-            return f"ℹ️ No incentives recorded for {emp['developer_name']}."
+        with db_cursor() as cursor:
+            # the grand total covers every entry, not just the ones listed below
+            cursor.execute(_INCENTIVE_TOTALS_SQL, (emp['id'],))
+            totals = cursor.fetchone() or {}
+            entries = int(totals.get('entries') or 0)
+            if not entries:
+                return f"ℹ️ No incentives recorded for {emp['developer_name']}."
+
+            cursor.execute(_INCENTIVES_SQL, (emp['id'],))
+            rows = cursor.fetchall()
 
-        total = sum(float(r.get('incentive') or 0) for r in rows)
-        response = f"💸 **Incentives for {emp['developer_name']}** — Total last entries: {len(rows)}\n"
-        response += f"🏷️ Sum: {total:.2f}\n\n"
-        for r in rows[:10]:
-            response += f"• {r.get('project_name','-')} — {r.get('incentive',0):.2f} ({r.get('added_at')})\n"
+        shown_total = sum(float(r.get('incentive') or 0) for r in rows)
+        parts = [f"💸 **Incentives for {emp['developer_name']}** — Total entries: {entries}\n"]
+        parts.append(f"🏷️ Grand total: {float(totals['total']):.2f}\n")
+        parts.append(f"🧾 Last {len(rows)} shown: {shown_total:.2f}\n\n")
+        for r in rows:
+            parts.append(f"• {r.get('project_name','-')} — {r.get('incentive',0):.2f} ({r.get('added_at')})\n")
             if r.get('remarks'):
-                response += f"  _{r.get('remarks')}_\n"
-        return response
+                parts.append(f"  _{r.get('remarks')}_\n")
+        return "".join(parts)
     except Exception as e:
         return f"❌ Error retrieving incentives: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_attendance_summary(name: str, days: int = 30, additional_context: Optional[str] = None) -> str:
     """
     Summarize attendance/presence using work_report entries and approved leaves.
@@ -1044,41 +1503,44 @@ def get_attendance_summary(name: str, days: int = 30, additional_context: Option
     emp = resolution['employee']
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        # work_report days
-        cursor.execute("""
-            SELECT DISTINCT date FROM work_report
-            WHERE developer_id = %s AND date >= %s AND date <= %s
-        """, (emp['id'], start_date, end_date))
-        work_days = {r['date'] for r in cursor.fetchall() if r.get('date')}
-        # approved leaves
-        cursor.execute("""
-            SELECT date_of_leave, leave_type FROM leave_requests
-            WHERE developer_id = %s AND status = 'Approved' AND date_of_leave >= %s AND date_of_leave <= %s
-        """, (emp['id'], start_date, end_date))
-        leaves = cursor.fetchall()
-        leave_days = [l['date_of_leave'] for l in leaves if l.get('date_of_leave')]
-
-        total_days = (end_date - start_date).days + 1
-        present_days = len(work_days)
-        approved_leave_days = len(set(leave_days))
-        absent_or_missing = total_days - (present_days + approved_leave_days)
-
-        response = f"📅 **Attendance Summary for {emp['developer_name']}**\n"
-        response += f"Period: {start_date} to {end_date} ({total_days} days)\n"
-        response += f"✅ Present (work_report): {present_days} days\n"
-        response += f"🏖️ Approved Leaves: {approved_leave_days} days\n"
-        response += f"❗Absent/Missing logs: {absent_or_missing} days\n"
-        return response
+        with db_cursor() as cursor:
+            # distinct work_report days, approved leave days and the days that are both,
+            # counted in one round trip
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(DISTINCT date) FROM work_report
+                     WHERE developer_id = %(id)s AND date >= %(start)s AND date <= %(end)s) AS work_days,
+                    (SELECT COUNT(DISTINCT date_of_leave) FROM leave_requests
+                     WHERE developer_id = %(id)s AND status = 'Approved'
+                       AND date_of_leave >= %(start)s AND date_of_leave <= %(end)s) AS leave_days,
+                    (SELECT COUNT(DISTINCT wr.date) FROM work_report wr
+                     JOIN leave_requests lr ON lr.developer_id = wr.developer_id
+                      AND lr.date_of_leave = wr.date AND lr.status = 'Approved'
+                     WHERE wr.developer_id = %(id)s AND wr.date >= %(start)s AND wr.date <= %(end)s) AS overlap_days
+            """, {"id": emp['id'], "start": start_date, "end": end_date})
+            counts = cursor.fetchone() or {}
+
+            total_days = (end_date - start_date).days + 1
+            present_days = int(counts.get('work_days') or 0)
+            approved_leave_days = int(counts.get('leave_days') or 0)
+            overlap_days = int(counts.get('overlap_days') or 0)
+            # a day with both a work report and an approved leave is only accounted for once
+            absent_or_missing = total_days - (present_days + approved_leave_days - overlap_days)
+
+            parts = [f"📅 **Attendance Summary for {emp['developer_name']}**\n"]
+            parts.append(f"Period: {start_date} to {end_date} ({total_days} days)\n")
+            parts.append(f"✅ Present (work_report): {present_days} days\n")
+            parts.append(f"🏖️ Approved Leaves: {approved_leave_days} days\n")
+            if overlap_days:
+                parts.append(f"🔁 Worked on approved leave: {overlap_days} days\n")
+            parts.append(f"❗Absent/Missing logs: {absent_or_missing} days\n")
+            return "".join(parts)
     except Exception as e:
         return f"❌ Error generating attendance summary: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_pf_status(name: str, additional_context: Optional[str] = None) -> str:
     """Check PF status and PF join / releiving dates"""
     resolution = resolve_employee_ai(name, additional_context)
@@ -1087,215 +1549,219 @@ def get_pf_status(name: str, additional_context: Optional[str] = None) -> str:
             return f"🔍 Ambiguous: \n\n{format_employee_options(resolution['employees'])}"
         return f"❌ No employee found matching '{name}'"
     emp = resolution['employee']
-    response = f"🏦 **PF Status for {emp['developer_name']}**\n"
-    response += f"PF Enabled: {'Yes' if emp.get('is_pf_enabled') in [1,'1',True] else 'No'}\n"
-    response += f"PF Join Date: {emp.get('pf_join_date','N/A')}\n"
-    response += f"Releiving Date: {emp.get('releiving_date','N/A') if 'releiving_date' in emp else 'N/A'}\n"
-    return response
+    parts = [f"🏦 **PF Status for {emp['developer_name']}**\n"]
+    parts.append(f"PF Enabled: {'Yes' if emp.get('is_pf_enabled') in [1,'1',True] else 'No'}\n")
+    parts.append(f"PF Join Date: {emp.get('pf_join_date','N/A')}\n")
+    parts.append(f"Releiving Date: {emp.get('releiving_date','N/A') if 'releiving_date' in emp else 'N/A'}\n")
+    return "".join(parts)
 
 # -------------------------------
 # Company Management Activities
 # -------------------------------
+# Reference data changes on the order of days: cache the raw rows and format per
+# call. The listing limits are applied in SQL so the result set stays bounded.
+_CLIENT_LIST_LIMIT = 50
+_PROJECT_LIST_LIMIT = 100
+
+@ttl_cache()
+def _fetch_clients(active_only: bool) -> List[Dict[str, Any]]:
+    with db_cursor() as cursor:
+        cursor.execute(
+            "SELECT id, client_name, company_name, contact_person, email_id, phone, status FROM client "
+            + ("WHERE status = 1 " if active_only else "")
+            + "ORDER BY client_name LIMIT %s",
+            (_CLIENT_LIST_LIMIT,),
+        )
+        return cursor.fetchall()
+
+@ttl_cache()
+def _fetch_projects(active_only: bool) -> List[Dict[str, Any]]:
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT p.id, p.title, p.status, c.client_name, c.email_id
+            FROM project p
+            LEFT JOIN client c ON p.client_id = c.id
+        """ + ("WHERE p.status = 1" if active_only else "") + """
+            ORDER BY p.date DESC
+            LIMIT %s
+        """, (_PROJECT_LIST_LIMIT,))
+        return cursor.fetchall()
+
+@ttl_cache()
+def _fetch_holidays(start: date, end: date) -> List[Dict[str, Any]]:
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT occasion, holiday_date
+            FROM holidays
+            WHERE holiday_date >= %s AND holiday_date <= %s
+            ORDER BY holiday_date ASC
+            LIMIT 100
+        """, (start, end))
+        return cursor.fetchall()
+
 @mcp.tool()
+@run_in_thread
 def get_client_list(active_only: bool = True) -> str:
     """List clients with contact details"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        if active_only:
-            cursor.execute("SELECT id, client_name, company_name, contact_person, email_id, phone, status FROM client WHERE status = 1 ORDER BY client_name")
-        else:
-            cursor.execute("SELECT id, client_name, company_name, contact_person, email_id, phone, status FROM client ORDER BY client_name")
-        rows = cursor.fetchall()
+        rows = _fetch_clients(bool(active_only))
         if not rows:
             return "ℹ️ No clients found."
 
-        response = "👥 **Clients**\n\n"
-        for r in rows[:50]:
-            response += f"• {r.get('client_name')} — {r.get('company_name')}\n"
-            response += f"   Contact: {r.get('contact_person') or 'N/A'} — {r.get('email_id') or 'N/A'} — {r.get('phone') or 'N/A'}\n"
-            response += f"   Status: {'Active' if r.get('status') == 1 else 'Inactive'}\n\n"
-        return response
+        parts = ["👥 **Clients**\n\n"]
+        for r in rows:
+            get = r.get
+            parts.append(_CLIENT_ROW.format_map(_RowView(
+                r,
+                contact_person=get('contact_person') or 'N/A',
+                email_id=get('email_id') or 'N/A',
+                phone=get('phone') or 'N/A',
+                active='Active' if get('status') == 1 else 'Inactive',
+            )))
+        return "".join(parts)
     except Exception as e:
         return f"❌ Error fetching clients: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_projects_overview(active_only: bool = True) -> str:
     """Show active (or all) projects with client info"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        if active_only:
-            cursor.execute("""
-                SELECT p.id, p.title, p.status, c.client_name, c.email_id
-                FROM project p
-                LEFT JOIN client c ON p.client_id = c.id
-                WHERE p.status = 1
-                ORDER BY p.date DESC
-            """)
-        else:
-            cursor.execute("""
-                SELECT p.id, p.title, p.status, c.client_name, c.email_id
-                FROM project p
-                LEFT JOIN client c ON p.client_id = c.id
-                ORDER BY p.date DESC
-            """)
-        projects = cursor.fetchall()
+        projects = _fetch_projects(bool(active_only))
         if not projects:
             return "❌ No projects found."
 
-        response = "🏗️ **Projects Overview**\n\n"
-        for proj in projects[:100]:
-            response += f"📌 {proj.get('title')} (ID: {proj.get('id')})\n"
-            response += f"   Client: {proj.get('client_name') or 'N/A'} — {proj.get('email_id') or 'N/A'}\n"
-            response += f"   Status: {'Active' if proj.get('status') == 1 else 'Inactive'}\n\n"
-        return response
+        parts = ["🏗️ **Projects Overview**\n\n"]
+        for proj in projects:
+            get = proj.get
+            parts.append(_PROJECT_ROW.format_map(_RowView(
+                proj,
+                client_name=get('client_name') or 'N/A',
+                email_id=get('email_id') or 'N/A',
+                active='Active' if get('status') == 1 else 'Inactive',
+            )))
+        return "".join(parts)
     except Exception as e:
         return f"❌ Error fetching projects: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_project_status_updates(project_settings_id: Optional[int] = None, limit: int = 20) -> str:
     """Fetch milestone progress & completion percentage"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        if project_settings_id:
-            cursor.execute("""
-                SELECT ps.id as project_settings_id, ps.project_name, ps.project_id, ps.current_milestone_id,
-                       ps.total_estimated_hrs, ps.is_incentive_enabled,
-                       pu.user_id as updated_by, ps.added_at
-                FROM project_settings ps
-                LEFT JOIN project_status_updates pu ON pu.project_settings_id = ps.id
-                WHERE ps.id = %s
-                LIMIT %s
-            """, (project_settings_id, limit))
-            rows = cursor.fetchall()
-        else:
-            cursor.execute("""
-                SELECT ps.id as project_settings_id, ps.project_name, ps.project_id, ps.current_milestone_id,
-                       ps.total_estimated_hrs, ps.is_incentive_enabled,
-                       pu.user_id as updated_by, pu.required_hours, pu.per_completed, pu.added_at
-                FROM project_settings ps
-                LEFT JOIN project_status_updates pu ON pu.project_settings_id = ps.id
-                ORDER BY pu.added_at DESC
-                LIMIT %s
-            """, (limit,))
-            rows = cursor.fetchall()
-
-        if not rows:
-            return "ℹ️ No project status updates found."
-
-        response = "🔄 **Project Status Updates**\n\n"
-        for r in rows[:limit]:
-            response += f"• Project: {r.get('project_name','-')} (Settings ID: {r.get('project_settings_id')})\n"
-            if r.get('required_hours') is not None:
-                response += f"   Required Hours: {r.get('required_hours')} | Completed%: {r.get('per_completed')}\n"
-            response += f"   Milestone: {r.get('current_milestone_id') or '-'} | Total Est Hrs: {r.get('total_estimated_hrs') or 0}\n"
-            response += f"   Updated at: {r.get('added_at')}\n\n"
-        return response
+        with db_cursor() as cursor:
+            if project_settings_id:
+                cursor.execute("""
+                    SELECT ps.id as project_settings_id, ps.project_name, ps.project_id, ps.current_milestone_id,
+                           ps.total_estimated_hrs, ps.is_incentive_enabled,
+                           pu.user_id as updated_by, ps.added_at
+                    FROM project_settings ps
+                    LEFT JOIN project_status_updates pu ON pu.project_settings_id = ps.id
+                    WHERE ps.id = %s
+                    LIMIT %s
+                """, (project_settings_id, limit))
+                rows = cursor.fetchall()
+            else:
+                cursor.execute("""
+                    SELECT ps.id as project_settings_id, ps.project_name, ps.project_id, ps.current_milestone_id,
+                           ps.total_estimated_hrs, ps.is_incentive_enabled,
+                           pu.user_id as updated_by, pu.required_hours, pu.per_completed, pu.added_at
+                    FROM project_settings ps
+                    LEFT JOIN project_status_updates pu ON pu.project_settings_id = ps.id
+                    ORDER BY pu.added_at DESC
+                    LIMIT %s
+                """, (limit,))
+                rows = cursor.fetchall()
+
+            if not rows:
+                return "ℹ️ No project status updates found."
+
+            parts = ["🔄 **Project Status Updates**\n\n"]
+            for r in rows[:limit]:
+                parts.append(f"• Project: {r.get('project_name','-')} (Settings ID: {r.get('project_settings_id')})\n")
+                if r.get('required_hours') is not None:
+                    parts.append(f"   Required Hours: {r.get('required_hours')} | Completed%: {r.get('per_completed')}\n")
+                parts.append(f"   Milestone: {r.get('current_milestone_id') or '-'} | Total Est Hrs: {r.get('total_estimated_hrs') or 0}\n")
+                parts.append(f"   Updated at: {r.get('added_at')}\n\n")
+            return "".join(parts)
     except Exception as e:
         return f"❌ Error fetching project status updates: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_payments_summary(period_months: int = 12) -> str:
     """View total payments received & missed invoices summary for last N months"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cutoff = date.today() - timedelta(days=30*period_months)
-        cursor.execute("""
-            SELECT SUM(amount) as total_received, COUNT(*) as count_received
-            FROM payments_received
-            WHERE added_at >= %s
-        """, (cutoff,))
-        rec = cursor.fetchone() or {}
-        total_received = float(rec.get('total_received') or 0)
-        count_received = int(rec.get('count_received') or 0)
+        with db_cursor() as cursor:
+            cutoff = date.today() - timedelta(days=30*period_months)
+            cursor.execute("""
+                SELECT SUM(amount) as total_received, COUNT(*) as count_received
+                FROM payments_received
+                WHERE added_at >= %s
+            """, (cutoff,))
+            rec = cursor.fetchone() or {}
+            total_received = float(rec.get('total_received') or 0)
+            count_received = int(rec.get('count_received') or 0)
 
-        cursor.execute("""
-            SELECT status, COUNT(*) as cnt, SUM(amount) as total_amount
-            FROM missed_invoices
-            WHERE added_at >= %s
-            GROUP BY status
-        """, (cutoff,))
-        invoices = cursor.fetchall()
-
-        response = f"💰 **Payments Summary (last {period_months} months)**\n"
-        response += f"Total Received: {total_received:.2f} across {count_received} payments\n\n"
-        if invoices:
-            response += "Missed/Other Invoices:\n"
-            for inv in invoices:
-                response += f" • {inv.get('status')}: {inv.get('cnt')} invoices — Total: {float(inv.get('total_amount') or 0):.2f}\n"
-        else:
-            response += "No missed invoices in the period.\n"
-        return response
+            cursor.execute("""
+                SELECT status, COUNT(*) as cnt, SUM(amount) as total_amount
+                FROM missed_invoices
+                WHERE added_at >= %s
+                GROUP BY status
+            """, (cutoff,))
+            invoices = cursor.fetchall()
+
+            parts = [f"💰 **Payments Summary (last {period_months} months)**\n"]
+            parts.append(f"Total Received: {total_received:.2f} across {count_received} payments\n\n")
+            if invoices:
+                parts.append("Missed/Other Invoices:\n")
+                for inv in invoices:
+                    parts.append(f" • {inv.get('status')}: {inv.get('cnt')} invoices — Total: {float(inv.get('total_amount') or 0):.2f}\n")
+            else:
+                parts.append("No missed invoices in the period.\n")
+            return "".join(parts)
     except Exception as e:
         return f"❌ Error computing payments summary: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_fixed_expenses(project_id: Optional[str] = None) -> str:
     """Retrieve company/project-level fixed expenses"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        if project_id:
-            cursor.execute("SELECT id, project_id, purpose, amount, added_at FROM fixed_expenses WHERE project_id = %s ORDER BY added_at DESC LIMIT 100", (project_id,))
-        else:
-            cursor.execute("SELECT id, project_id, purpose, amount, added_at FROM fixed_expenses ORDER BY added_at DESC LIMIT 100")
-        rows = cursor.fetchall()
-        if not rows:
-            return "ℹ️ No fixed expenses found."
-
-        total = sum(float(r.get('amount') or 0) for r in rows)
-        response = f"🧾 **Fixed Expenses** — Entries: {len(rows)} — Total: {total:.2f}\n\n"
-        for r in rows[:50]:
-            response += f"• Project: {r.get('project_id')} — {r.get('purpose')} — {r.get('amount'):.2f} ({r.get('added_at')})\n"
-        return response
+        with db_cursor() as cursor:
+            if project_id:
+                cursor.execute("SELECT id, project_id, purpose, amount, added_at FROM fixed_expenses WHERE project_id = %s ORDER BY added_at DESC LIMIT 100", (project_id,))
+            else:
+                cursor.execute("SELECT id, project_id, purpose, amount, added_at FROM fixed_expenses ORDER BY added_at DESC LIMIT 100")
+            rows = cursor.fetchall()
+            if not rows:
+                return "ℹ️ No fixed expenses found."
+
+            total = sum(float(r.get('amount') or 0) for r in rows)
+            parts = [f"🧾 **Fixed Expenses** — Entries: {len(rows)} — Total: {total:.2f}\n\n"]
+            for r in rows[:50]:
+                parts.append(f"• Project: {r.get('project_id')} — {r.get('purpose')} — {r.get('amount'):.2f} ({r.get('added_at')})\n")
+            return "".join(parts)
     except Exception as e:
         return f"❌ Error fetching fixed expenses: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 @mcp.tool()
+@run_in_thread
 def get_holidays(upcoming_days: int = 90) -> str:
     """List upcoming company holidays"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
         today = date.today()
         end = today + timedelta(days=upcoming_days)
-        cursor.execute("""
-            SELECT occasion, holiday_date
-            FROM holidays
-            WHERE holiday_date >= %s AND holiday_date <= %s
-            ORDER BY holiday_date ASC
-        """, (today, end))
-        rows = cursor.fetchall()
+        rows = _fetch_holidays(today, end)
         if not rows:
             return f"ℹ️ No holidays in the next {upcoming_days} days."
 
-        response = f"🎉 **Upcoming Holidays (next {upcoming_days} days)**\n"
-        for r in rows[:100]:
-            response += f"• {r.get('holiday_date')} — {r.get('occasion')}\n"
-        return response
+        parts = [f"🎉 **Upcoming Holidays (next {upcoming_days} days)**\n"]
+        for r in rows:
+            parts.append(f"• {r.get('holiday_date')} — {r.get('occasion')}\n")
+        return "".join(parts)
     except Exception as e:
         return f"❌ Error fetching holidays: {e}"
-    finally:
-        cursor.close()
-        conn.close()
 
 # -------------------------------
 # HTTP Endpoints
@@ -1335,8 +1801,8 @@ async def root(request: Request) -> JSONResponse:
 # Run MCP server
 # -------------------------------
 if __name__ == "__main__":
-    if Levenshtein is None and DEBUG:
-        print("Warning: python-levenshtein not installed. Fuzzy quality will be slightly lower. Install with: pip install python-Levenshtein")
+    if rf_fuzz is None and Levenshtein is None:
+        logger.debug("Warning: rapidfuzz not installed. Fuzzy matching falls back to the slower difflib. Install with: pip install rapidfuzz")
 
     if REQUIRE_API_KEY and not VALID_API_KEYS and not SCANNER_MODE:
         print("⚠️  WARNING: API key authentication is enabled but no valid API keys are configured!")
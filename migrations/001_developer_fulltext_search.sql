@@ -0,0 +1,5 @@
+-- FULLTEXT index backing the employee search in fetch_employees_ai().
+-- The MATCH() column list in main.py must match this index exactly.
+-- Without it the server keeps using the LIKE '%term%' scan.
+ALTER TABLE developer
+    ADD FULLTEXT INDEX idx_emp_search (developer_name, email_id, emp_number, mobile);
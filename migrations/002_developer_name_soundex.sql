@@ -0,0 +1,3 @@
+-- Functional index for the SOUNDEX prefilter in the fuzzy employee fallback.
+-- Requires MySQL 8.0.13+. Older servers evaluate the same predicate with a scan.
+CREATE INDEX idx_dev_name_soundex ON developer ((SOUNDEX(developer_name)));
@@ -0,0 +1,8 @@
+-- Composite indexes for the per-employee lookups in main.py
+-- (work report, leave history/balance/attendance, appraisal feedback, incentives).
+-- Each matches the query's WHERE column plus its ORDER BY column, so MySQL reads
+-- rows in order and stops at the LIMIT instead of filesorting.
+CREATE INDEX idx_wr_dev_date ON work_report (developer_id, date DESC);
+CREATE INDEX idx_lr_dev_date ON leave_requests (developer_id, date_of_leave DESC);
+CREATE INDEX idx_af_dev_date ON appraisal_feedback (developer_id, date_of_incident DESC);
+CREATE INDEX idx_ie_user_added ON incentive_earned (user_id, added_at DESC);
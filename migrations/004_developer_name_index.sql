@@ -0,0 +1,5 @@
+-- B-tree index for the prefix branch of the SOUNDEX prefilter in the fuzzy
+-- employee fallback (developer_name LIKE 'x%'). The FULLTEXT index from 001
+-- cannot serve LIKE; together with idx_dev_name_soundex from 002, each branch
+-- of that query's UNION reads an index instead of scanning developer.
+CREATE INDEX idx_dev_name ON developer (developer_name);